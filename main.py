@@ -1,7 +1,6 @@
 # Bank Management System
 import os
-import pandas as pd
-import csv
+from collections import deque
 class BankAccount:
     def __init__(self, account_holder: str, bank_name: str, balance: float=0):
         self.account_holder = account_holder
@@ -24,6 +23,13 @@ class BankAccount:
         print(f"Name of bank: {self.bank_name}")
         print(f"Balance: ${self.balance}")
  
+def ledger_line(transaction_id: int, status: str, amount: float, detail: str):
+    # Format one ledger row as a line of CSV
+    # The free-text detail is quoted if it contains a comma, quote or line break
+    if any(c in detail for c in ',"\r\n'):
+        detail = '"' + detail.replace('"', '""') + '"'
+    return f"{transaction_id},{status},{amount:.2f},{detail}\n"
+
 # Check if the user has an already existing bank account and proceed accordingly
 
 '''
@@ -48,53 +54,63 @@ name:str = input("Under what name would you like to open your new account? ")
 bank:str = input("\nWith which bank would you like to open your new account? ")
 account = BankAccount(name, bank)
  
+# Columns of the account's ledger file
+
+LEDGER_COLUMNS = ["Transaction ID","Status","Amount","Source/Reason"]
+
+# Every accepted way of typing an action, mapped to the action it selects
+
+ACTIONS = {alias: "deposit" for alias in ("deposit", "deposit money", "1", "(1)")}
+ACTIONS.update({alias: "withdraw" for alias in ("withdraw", "withdraw money", "2", "(2)")})
+ACTIONS.update({alias: "balance" for alias in ("show balance", "balance", "3", "(3)")})
+
 # Simulate user actions
 
 action:str = input("\nWhat would you like to do?: \n(1) Deposit money\n(2) Withdraw money\n(3) Check Balance\n")
 
-list1 = []
+# Transactions made this session, as (Status, Amount, Source/Reason) tuples
+# They are kept in memory and only written to the ledger file on exit
+
+ledger = deque()
 
-match action.lower():
+match ACTIONS.get(action.strip().lower()):
 
-    case "deposit" | "deposit money" | "1" | "(1)": 
+    case "deposit": 
         amount, source = input("\nPlease enter the amount you would like to deposit, followed by the source of the money to be deposited, separated by commas.\n").split(", ")
-        list1.append("Deposit")
         amount = float(amount)
-        list1.append(amount)
-        list1.append(source)
+        ledger.append(("Deposit", amount, source))
         account.deposit(amount, source)
 
-    case "withdraw" | "withdraw money" | "2" | "(2)": 
+    case "withdraw": 
         amount, reason = input("\nPlease enter the amount you would like to withdraw, followed by the reason for withdrawal, separated by commas.\n").split(", ")
-        list1.append("Withdrawal")
         amount = float(amount)
-        list1.append(amount)
-        list1.append(reason)
+        ledger.append(("Withdrawal", amount, reason))
         account.withdraw(amount, reason)
         
-    case "show balance" | "balance" | "3" | "(3)": account.show_balance()
+    case "balance": account.show_balance()
 
     case _: print("\nPlease choose one of the listed actions.")
 
-if os.path.exists(f'{name}.csv') == True:
-    bank_database = pd.read_csv(f'{name}.csv', index_col=0)
-    bank_database.loc[len(bank_database)+1] = list1
-
-    if bank_database.index[0] == 0:
-        bank_database.index +=1
-
-    bank_database.to_csv(f'{name}.csv', index=True, index_label="Transaction ID")
-
-else:
-    with open(f'{name}.csv', 'w') as f:
-        header = ["Status","Amount","Source/Reason"]
-        writer = csv.writer(f)
-        writer.writerow(header)
-
-    bank_database = pd.read_csv(f'{name}.csv')
-    bank_database.loc[len(bank_database)+1] = list1
-
-    if bank_database.index[0] == 0:
-        bank_database.index +=1
-
-    bank_database.to_csv(f'{name}.csv', index=True, index_label="Transaction ID")
\ No newline at end of file
+# Append this session's transactions to the account's ledger file
+# Only the new rows are written, the existing history is never rewritten
+
+if ledger:
+    # O_APPEND makes every write go to the end of the file in one step,
+    # O_CREAT creates the file if it doesn't exist yet
+    fd = os.open(f'{name}.csv', os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        with open(fd, 'rb', closefd=False) as f:
+            line_count = sum(1 for _ in f)
+
+        # Transaction IDs run from 1, so the next ID is the number of rows (minus the header) plus one
+        # An empty file is new and still needs its header
+        lines = []
+        if line_count == 0:
+            lines.append(",".join(LEDGER_COLUMNS) + "\n")
+        next_id = max(line_count, 1)
+        lines.extend(ledger_line(transaction_id, *row) for transaction_id, row in enumerate(ledger, start=next_id))
+
+        # All of the new rows go to disk in a single write
+        os.write(fd, "".join(lines).encode('utf-8'))
+    finally:
+        os.close(fd)
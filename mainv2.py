@@ -1,7 +1,79 @@
 import sqlite3
 import os
+import sys
+import io
+import csv
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 from datetime import datetime
 
+# Number of rows handed to executemany() at a time by batch operations
+BATCH_SIZE = 10000
+
+# Number of buffered balance check records written to the database at once
+AUDIT_FLUSH_EVERY = 20
+
+# Number of rows formatted together by each worker when exporting history
+EXPORT_CHUNK_SIZE = 50000
+
+# Schema version stored in PRAGMA user_version
+# 1: transactions.transaction_date holds integer epoch microseconds
+# 2: history is indexed by (account_id, transaction_id) instead of by date
+SCHEMA_VERSION = 2
+
+# Number of prepared statements SQLite keeps per connection
+# Large enough that every statement below stays prepared between calls
+CACHED_STATEMENTS = 256
+
+# ============================================================================
+# SQL STATEMENTS
+# ============================================================================
+# Defined once here so each statement is always the same string and can be
+# reused from the connection's statement cache instead of being parsed again
+
+SQL_SELECT_ACCOUNT = "SELECT account_id, balance FROM accounts WHERE account_holder = ?"
+
+# RETURNING hands back the new row in the same statement
+# If another connection created the same holder in the meantime, the no-op
+# DO UPDATE makes RETURNING give back that existing row instead of failing
+SQL_INSERT_ACCOUNT = """INSERT INTO accounts (account_holder, bank_name, balance)
+    VALUES (?, ?, ?)
+    ON CONFLICT(account_holder) DO UPDATE SET account_holder = excluded.account_holder
+    RETURNING account_id, balance"""
+
+SQL_SELECT_BALANCE = "SELECT balance FROM accounts WHERE account_id = ?"
+
+SQL_INSERT_TXN = """INSERT INTO transactions
+    (account_id, action, amount, source_or_reason, balance_after, transaction_date)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+
+SQL_INSERT_BALANCE_CHECK = """INSERT INTO transactions
+    (account_id, action, balance_after, transaction_date)
+    VALUES (?, ?, ?, ?)"""
+
+SQL_SELECT_HISTORY = """SELECT transaction_id, action, amount, source_or_reason, balance_after, transaction_date
+    FROM transactions
+    WHERE account_id = ?
+    ORDER BY transaction_id DESC
+    LIMIT ?"""
+
+SQL_SELECT_FULL_HISTORY = """SELECT transaction_id, action, amount, source_or_reason, balance_after, transaction_date
+    FROM transactions
+    WHERE account_id = ?
+    ORDER BY transaction_id"""
+
+SQL_SELECT_HISTORY_BEFORE = """SELECT transaction_id, action, amount, source_or_reason, balance_after, transaction_date
+    FROM transactions
+    WHERE account_id = ?
+      AND transaction_id < ?
+    ORDER BY transaction_id DESC
+    LIMIT ?"""
+
 # ============================================================================
 # DATABASE SETUP AND INITIALIZATION
 # ============================================================================
@@ -21,8 +93,24 @@ class BankDatabase:
         """
         # sqlite3.connect() opens a connection to the database file
         # If the file doesn't exist, it creates it automatically
-        self.connection = sqlite3.connect(db_name)
-        
+        # cached_statements sets how many prepared statements are kept for reuse
+        self.connection = sqlite3.connect(db_name, cached_statements=CACHED_STATEMENTS)
+
+        # Write-ahead logging: commits become a single append to the WAL file
+        # and readers no longer block the writer
+        # journal_mode returns the mode actually in effect (e.g. 'memory' for :memory: databases)
+        self.journal_mode = self.connection.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+
+        # In WAL mode NORMAL is still safe against application crashes,
+        # only a power loss can drop the most recent commits
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        # Keep temporary tables/indices in memory, use a 64 MiB page cache
+        # and memory-map up to 256 MiB of the database file
+        self.connection.execute("PRAGMA temp_store = MEMORY")
+        self.connection.execute("PRAGMA cache_size = -65536")
+        self.connection.execute("PRAGMA mmap_size = 268435456")
+
         # Enable foreign key constraints (disabled by default in SQLite)
         # This ensures data integrity when records reference other records
         self.connection.execute("PRAGMA foreign_keys = 1")
@@ -39,6 +127,8 @@ class BankDatabase:
         Create two main tables:
         1. accounts - Stores account holder information
         2. transactions - Stores all transaction records linked to accounts
+        plus an index for history lookups and a trigger that applies each
+        deposit/withdrawal to the account balance.
         """
         
         # -------- CREATE ACCOUNTS TABLE --------
@@ -94,8 +184,10 @@ class BankDatabase:
             -- The account balance immediately after this transaction
             -- Stored for record-keeping and audit purposes
             
-            transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            -- Records when the transaction occurred
+            transaction_date INTEGER NOT NULL,
+            -- Records when the transaction occurred, as microseconds since the epoch
+            -- Set by the application (time.time_ns() // 1000) rather than by SQLite,
+            -- so it is stored and compared as a plain 8-byte integer
             
             FOREIGN KEY (account_id) REFERENCES accounts(account_id) ON DELETE CASCADE
             -- Foreign Key relationship to the accounts table:
@@ -105,12 +197,81 @@ class BankDatabase:
         );
         """
         
-        # Execute both CREATE TABLE statements
-        # IF NOT EXISTS prevents errors if tables already exist
-        self.cursor.execute(create_accounts_table)
-        self.cursor.execute(create_transactions_table)
+        # -------- CREATE HISTORY INDEX --------
+        # Lets get_transaction_history() read an account's transactions
+        # straight from the index, in the order they were made, with no sort step
+        # transaction_ids only ever increase, so each page of history can seek
+        # directly to where the last one ended
+        # (account_holder lookups are already covered by its UNIQUE index)
+        create_history_index = """
+        CREATE INDEX IF NOT EXISTS idx_txn_account_id
+        ON transactions(account_id, transaction_id);
+        """
+        
+        # -------- CREATE BALANCE TRIGGER --------
+        # Keeps accounts.balance in sync with the transaction log, so a
+        # deposit or withdrawal only needs a single INSERT statement
+        create_balance_trigger = """
+        CREATE TRIGGER IF NOT EXISTS trg_apply_txn
+        AFTER INSERT ON transactions
+        WHEN NEW.action IN ('Deposit', 'Withdrawal')
+        BEGIN
+            UPDATE accounts SET balance = NEW.balance_after
+            WHERE account_id = NEW.account_id;
+        END;
+        """
+        
+        # Execute the CREATE statements
+        # IF NOT EXISTS prevents errors if they already exist
+        # sqlite3 doesn't start a transaction for CREATE statements by itself,
+        # so BEGIN opens one explicitly; the connection context manager then
+        # commits the changes permanently (or rolls them all back if anything fails)
+        self.connection.execute("BEGIN")
+        with self.connection:
+            self.cursor.execute(create_accounts_table)
+            self.cursor.execute(create_transactions_table)
+            self.cursor.execute(create_history_index)
+            self.cursor.execute(create_balance_trigger)
+        
+        self.migrate()
+    
+    def migrate(self):
+        """
+        Bring databases created by older versions of the program up to date.
+        PRAGMA user_version records which changes have already been applied.
+        """
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
         
-        # commit() saves the changes permanently to the database
+        # BEGIN is needed for DROP INDEX to be part of the transaction
+        self.connection.execute("BEGIN")
+        with self.connection:
+            if version < 1:
+                # Older databases stored transaction_date as 'YYYY-MM-DD HH:MM:SS' text (UTC)
+                # strftime('%s') converts that to seconds since the epoch
+                self.cursor.execute(
+                    """UPDATE transactions
+                       SET transaction_date = CAST(strftime('%s', transaction_date) AS INTEGER) * 1000000
+                       WHERE typeof(transaction_date) = 'text'"""
+                )
+            
+            if version < 2:
+                # History used to be ordered and paged by date
+                self.cursor.execute("DROP INDEX IF EXISTS idx_txn_account_date")
+            
+            # PRAGMA statements can't use ? placeholders, SCHEMA_VERSION is a constant
+            self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def begin(self):
+        """
+        Start an explicit transaction.
+        Statements executed until commit() are written to disk together.
+        """
+        self.connection.execute("BEGIN")
+    
+    def commit(self):
+        """Commit the current transaction"""
         self.connection.commit()
     
     def close(self):
@@ -130,7 +291,8 @@ class BankAccount:
     all transactions in the database.
     """
     
-    def __init__(self, account_holder: str, bank_name: str, db_cursor, db_connection):
+    def __init__(self, account_holder: str, bank_name: str, db_cursor, db_connection,
+                 audit_reads: bool = False):
         """
         Initialize or retrieve a bank account.
         
@@ -139,6 +301,7 @@ class BankAccount:
             bank_name (str): Name of the bank
             db_cursor: Database cursor for executing queries
             db_connection: Database connection object for committing changes
+            audit_reads (bool): Record every balance check in the transactions table
         """
         self.account_holder = account_holder
         self.bank_name = bank_name
@@ -146,6 +309,15 @@ class BankAccount:
         self.connection = db_connection
         self.account_id = None
         self.balance = 0.0
+        self.audit_reads = audit_reads
+        
+        # self.balance is kept up to date by every write this object makes,
+        # so it only needs re-reading if it may no longer match the database,
+        # e.g. after a write left for the caller to commit (or roll back)
+        self._balance_dirty = False
+        
+        # Balance check records waiting to be written (see flush_audit())
+        self._pending_audit = []
         
         # Check if account already exists, if not create it
         self.create_or_retrieve_account()
@@ -158,7 +330,7 @@ class BankAccount:
         """
         # SELECT query to find an existing account with this holder name
         self.cursor.execute(
-            "SELECT account_id, balance FROM accounts WHERE account_holder = ?",
+            SQL_SELECT_ACCOUNT,
             (self.account_holder,)  # ? is a placeholder to prevent SQL injection
         )
         
@@ -171,65 +343,51 @@ class BankAccount:
             print(f"\n✓ Account retrieved for {self.account_holder}")
         else:
             # Account doesn't exist - create a new one
-            self.cursor.execute(
-                """INSERT INTO accounts (account_holder, bank_name, balance)
-                   VALUES (?, ?, ?)""",
-                (self.account_holder, self.bank_name, 0.0)
-            )
-            # commit() saves the INSERT to the database
-            self.connection.commit()
-            
-            # Get the ID of the newly created account
-            # lastrowid returns the primary key of the last inserted row
-            self.account_id = self.cursor.lastrowid
-            self.balance = 0.0
+            # Leaving the with block commits the INSERT to the database
+            with self.connection:
+                self.cursor.execute(
+                    SQL_INSERT_ACCOUNT,
+                    (self.account_holder, self.bank_name, 0.0)
+                )
+                
+                # The INSERT returns the ID (and balance) of the new account
+                self.account_id, self.balance = self.cursor.fetchone()
             print(f"\n✓ New account created for {self.account_holder}")
     
-    def deposit(self, amount: float, source: str):
+    def deposit(self, amount: float, source: str, autocommit: bool = True):
         """
         Add money to the account and record the transaction.
         
         Args:
             amount (float): Amount to deposit
             source (str): Source of the deposit (e.g., "Salary", "Transfer")
+            autocommit (bool): Commit immediately. Pass False when the caller
+                groups several operations into one transaction.
         """
         # Validate input
         if amount <= 0:
             print("\n✗ Deposit amount must be positive!")
             return False
         
-        # Update the account balance in the database
-        self.balance += amount
-        
-        # UPDATE query to modify the balance in the accounts table
-        self.cursor.execute(
-            "UPDATE accounts SET balance = ? WHERE account_id = ?",
-            (self.balance, self.account_id)
-        )
+        self._refresh_balance()
         
         # Record the transaction in the transactions table
-        self.cursor.execute(
-            """INSERT INTO transactions 
-               (account_id, action, amount, source_or_reason, balance_after)
-               VALUES (?, ?, ?, ?, ?)""",
-            (self.account_id, 'Deposit', amount, source, self.balance)
-        )
-        
-        # Save all changes to the database
-        self.connection.commit()
+        self._record_mutation(amount, 'Deposit', source, autocommit)
         
         print(f"\n✓ Deposited: ${amount:.2f}")
         print(f"  Source: {source}")
         print(f"  Current Balance: ${self.balance:.2f}")
         return True
     
-    def withdraw(self, amount: float, reason: str):
+    def withdraw(self, amount: float, reason: str, autocommit: bool = True):
         """
         Remove money from the account and record the transaction.
         
         Args:
             amount (float): Amount to withdraw
             reason (str): Reason for withdrawal (e.g., "Bills", "Shopping")
+            autocommit (bool): Commit immediately. Pass False when the caller
+                groups several operations into one transaction.
         """
         # Validate input
         if amount <= 0:
@@ -237,43 +395,62 @@ class BankAccount:
             return False
         
         # Check for sufficient balance (THIS WAS COMMENTED OUT IN YOUR ORIGINAL CODE)
+        self._refresh_balance()
         if self.balance < amount:
             print(f"\n✗ Insufficient balance! Available: ${self.balance:.2f}")
             return False
         
-        # Update the account balance
-        self.balance -= amount
-        
-        # UPDATE query to modify the balance in the database
-        self.cursor.execute(
-            "UPDATE accounts SET balance = ? WHERE account_id = ?",
-            (self.balance, self.account_id)
-        )
-        
         # Record the transaction
-        self.cursor.execute(
-            """INSERT INTO transactions 
-               (account_id, action, amount, source_or_reason, balance_after)
-               VALUES (?, ?, ?, ?, ?)""",
-            (self.account_id, 'Withdrawal', amount, reason, self.balance)
-        )
-        
-        # Save changes to the database
-        self.connection.commit()
+        self._record_mutation(-amount, 'Withdrawal', reason, autocommit)
         
         print(f"\n✓ Withdrawn: ${amount:.2f}")
         print(f"  Reason: {reason}")
         print(f"  Current Balance: ${self.balance:.2f}")
         return True
     
-    def check_balance(self):
+    def _record_mutation(self, signed_amount: float, action_label: str, detail: str, autocommit: bool):
         """
-        Display account balance and record a balance check transaction.
-        This helps maintain a complete audit trail.
+        Insert one deposit or withdrawal and update the in-memory balance.
+        Shared by deposit() and withdraw(), which validate the amount first.
+        
+        Args:
+            signed_amount (float): Change to the balance (negative for withdrawals)
+            action_label (str): 'Deposit' or 'Withdrawal'
+            detail (str): Source of a deposit or reason for a withdrawal
+            autocommit (bool): Commit immediately rather than leaving the
+                caller's transaction open
         """
-        # Refresh balance from database to ensure we have the latest value
+        # History is ordered by transaction_id, so earlier balance checks
+        # still waiting in the buffer must get their IDs first
+        self.flush_audit()
+        
+        new_balance = self.balance + signed_amount
+        
+        # (trg_apply_txn updates the balance in the accounts table)
+        # The connection context manager commits on success and rolls back
+        # on error; with autocommit=False the caller's transaction is left open
+        with self.connection if autocommit else nullcontext():
+            self.cursor.execute(
+                SQL_INSERT_TXN,
+                (self.account_id, action_label, abs(signed_amount), detail, new_balance, time.time_ns() // 1000)
+            )
+        self.balance = new_balance
+        
+        # The caller may still roll this write back
+        if not autocommit:
+            self._balance_dirty = True
+    
+    def _refresh_balance(self):
+        """
+        Re-read the balance from the database if self.balance may be stale.
+        While a transaction is open its writes can still be rolled back,
+        so the balance stays marked as stale until it is committed.
+        """
+        if not self._balance_dirty:
+            return
+        
         self.cursor.execute(
-            "SELECT balance FROM accounts WHERE account_id = ?",
+            SQL_SELECT_BALANCE,
             (self.account_id,)
         )
         
@@ -281,15 +458,262 @@ class BankAccount:
         result = self.cursor.fetchone()
         if result:
             self.balance = result[0]
+        if not self.connection.in_transaction:
+            self._balance_dirty = False
+    
+    def apply_batch(self, operations):
+        """
+        Record many deposits and withdrawals in a single transaction.
+        Much faster than calling deposit()/withdraw() in a loop when
+        importing or replaying a history, since SQLite only has to sync
+        the journal once per batch instead of once per operation.
+        
+        Args:
+            operations: Iterable of (action, amount, detail) tuples where
+                action is 'Deposit' or 'Withdrawal'
+        
+        Returns:
+            bool: True if every operation was recorded, False if the batch
+                was rejected (nothing is written in that case)
+        """
+        # Validate the whole batch up front and work out the running balance
+        # so that a bad row can't leave half a batch in the database
+        self._refresh_balance()
+        rows = []
+        balance = self.balance
+        now = time.time_ns() // 1000
+        try:
+            for action, amount, detail in operations:
+                balance, row = self._batch_row(balance, action, amount, detail, now)
+                rows.append(row)
+        except ValueError as e:
+            print(f"\n✗ Batch rejected: {e}")
+            return False
+        
+        if not rows:
+            return True
+        
+        # Earlier buffered balance checks get their transaction IDs first
+        self.flush_audit()
+        
+        # The whole batch is committed together, or rolled back on error
+        with self._batch_transaction():
+            # Insert in chunks so huge imports don't build one giant statement list
+            # (trg_apply_txn keeps the accounts table balance up to date)
+            for start in range(0, len(rows), BATCH_SIZE):
+                self.cursor.executemany(
+                    SQL_INSERT_TXN,
+                    rows[start:start + BATCH_SIZE]
+                )
+        
+        self.balance = balance
+        print(f"\n✓ Recorded {len(rows)} transactions")
+        print(f"  Current Balance: ${self.balance:.2f}")
+        return True
+    
+    def _batch_row(self, balance: float, action: str, amount: float, detail: str, timestamp: int):
+        """
+        Check one deposit or withdrawal of a batch and build its row.
+        Shared by apply_batch() and import_csv() so both apply the same rules.
+        
+        Args:
+            balance (float): Running balance before this operation
+            action (str): 'Deposit' or 'Withdrawal'
+            amount (float): Amount of the operation
+            detail (str): Source of a deposit or reason for a withdrawal
+            timestamp (int): Transaction time in epoch microseconds
+        
+        Returns:
+            tuple: (balance after the operation, row for SQL_INSERT_TXN)
+        
+        Raises:
+            ValueError: If the amount isn't positive, the action is unknown,
+                or a withdrawal exceeds the running balance
+        """
+        if amount <= 0:
+            raise ValueError(f"{action} amount must be positive")
+        if action == 'Deposit':
+            balance += amount
+        elif action == 'Withdrawal':
+            if balance < amount:
+                raise ValueError(f"insufficient balance for withdrawal of ${amount:.2f}")
+            balance -= amount
+        else:
+            raise ValueError(f"unknown action '{action}'")
+        return balance, (self.account_id, action, amount, detail, balance, timestamp)
+    
+    @contextmanager
+    def _batch_transaction(self):
+        """
+        Run a block of statements as one unit.
+        If the caller has no transaction open, a new one is started with
+        BEGIN IMMEDIATE (taking the write lock straight away) and committed
+        at the end, or rolled back on error.
+        If the caller already opened a transaction (e.g. with BankDatabase.begin()),
+        a SAVEPOINT is used instead: on error only this block is undone, and
+        committing is left to the caller.
+        """
+        if not self.connection.in_transaction:
+            self.connection.execute("BEGIN IMMEDIATE")
+            with self.connection:
+                yield
+            return
+        
+        self.connection.execute("SAVEPOINT batch")
+        try:
+            yield
+        except BaseException:
+            self.connection.execute("ROLLBACK TO batch")
+            self.connection.execute("RELEASE batch")
+            raise
+        self.connection.execute("RELEASE batch")
+        
+        # The caller may still roll the whole transaction back
+        self._balance_dirty = True
+    
+    def deposit_many(self, deposits):
+        """
+        Record several deposits at once using a single prepared INSERT.
+
+        Args:
+            deposits: Iterable of (amount, source) tuples
+
+        Returns:
+            bool: True if all deposits were recorded
+        """
+        return self.apply_batch(('Deposit', amount, source) for amount, source in deposits)
+
+    def withdraw_many(self, withdrawals):
+        """
+        Record several withdrawals at once using a single prepared INSERT.
+
+        Args:
+            withdrawals: Iterable of (amount, reason) tuples
+
+        Returns:
+            bool: True if all withdrawals were recorded
+        """
+        return self.apply_batch(('Withdrawal', amount, reason) for amount, reason in withdrawals)
+
+    def import_csv(self, path: str):
+        """
+        Import a CSV ledger written by main.py (Transaction ID, Status,
+        Amount, Source/Reason) into this account as a single transaction.
+        A background thread reads and parses the file in batches of
+        BATCH_SIZE rows while this thread inserts the previous batch, so
+        reading the file overlaps with writing to the database.
+        
+        Args:
+            path (str): Path of the CSV ledger to import
+        
+        Returns:
+            bool: True if the ledger was imported, False if it was rejected
+                (nothing is written in that case)
+        """
+        # At most 4 parsed batches wait in memory for the database
+        batches = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        reader = threading.Thread(target=self._read_csv_batches, args=(path, batches, stop), daemon=True)
+        reader.start()
+        
+        self._refresh_balance()
+        balance = self.balance
+        now = time.time_ns() // 1000
+        count = 0
+        try:
+            # Earlier buffered balance checks get their transaction IDs first
+            self.flush_audit()
+            
+            # The whole import is committed together, or rolled back on error
+            with self._batch_transaction():
+                while True:
+                    batch = batches.get()
+                    if batch is None:
+                        break
+                    if isinstance(batch, Exception):
+                        raise batch
+                    
+                    rows = []
+                    for action, amount, detail in batch:
+                        balance, row = self._batch_row(balance, action, amount, detail, now)
+                        rows.append(row)
+                    
+                    # (trg_apply_txn keeps the accounts table balance up to date)
+                    self.cursor.executemany(SQL_INSERT_TXN, rows)
+                    count += len(rows)
+        except (ValueError, OSError, csv.Error) as e:
+            print(f"\n✗ Import rejected: {e}")
+            return False
+        finally:
+            # Tell the reader to give up if the import stopped early
+            stop.set()
+            reader.join()
+        
+        self.balance = balance
+        print(f"\n✓ Imported {count} transactions from {path}")
+        print(f"  Current Balance: ${self.balance:.2f}")
+        return True
+    
+    @staticmethod
+    def _read_csv_batches(path, batches, stop):
+        """
+        Read a main.py CSV ledger and put lists of (action, amount, detail)
+        tuples on the batches queue (runs in a background thread).
+        None is put at the end of the file; the exception is put instead
+        if anything goes wrong, so the consumer is never left waiting.
+        
+        Args:
+            path (str): Path of the CSV ledger
+            batches (queue.Queue): Queue the parsed batches are put on
+            stop (threading.Event): Set by the consumer to stop reading early
+        """
+        def put(item):
+            # Wait for room on the queue, unless the consumer has stopped
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = csv.reader(f)
+                batch = []
+                for row in rows:
+                    # Skip the header and blank lines
+                    if not row or row[0] == "Transaction ID":
+                        continue
+                    _, action, amount, detail = row
+                    batch.append((action, float(amount), detail))
+                    if len(batch) >= BATCH_SIZE:
+                        if not put(batch):
+                            return
+                        batch = []
+                if batch and not put(batch):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(None)
+    
+    def check_balance(self):
+        """
+        Display account balance.
+        If audit_reads is enabled, also record a balance check transaction
+        to maintain a complete audit trail.
+        """
+        # Refresh balance from database only if it may be out of date
+        self._refresh_balance()
         
         # Record the balance check action
-        self.cursor.execute(
-            """INSERT INTO transactions 
-               (account_id, action, balance_after)
-               VALUES (?, ?, ?)""",
-            (self.account_id, 'Balance Check', self.balance)
-        )
-        self.connection.commit()
+        # The time is taken now, since the row is only written on the next flush
+        if self.audit_reads:
+            checked_at = time.time_ns() // 1000
+            self._pending_audit.append((self.account_id, 'Balance Check', self.balance, checked_at))
+            if len(self._pending_audit) >= AUDIT_FLUSH_EVERY:
+                self.flush_audit()
         
         # Display account information
         print(f"\n{'='*40}")
@@ -299,56 +723,197 @@ class BankAccount:
         print(f"Current Balance: ${self.balance:.2f}")
         print(f"{'='*40}")
     
-    def get_transaction_history(self):
+    def flush_audit(self):
         """
-        Retrieve and display all transactions for this account from the database.
+        Write any buffered balance check records to the database.
         """
-        # SELECT query to get all transactions for this account
-        # ORDER BY transaction_date DESC sorts by most recent first
-        self.cursor.execute(
-            """SELECT transaction_id, action, amount, source_or_reason, balance_after, transaction_date
-               FROM transactions 
-               WHERE account_id = ? 
-               ORDER BY transaction_date DESC""",
-            (self.account_id,)
+        if not self._pending_audit:
+            return
+        
+        # Inside the caller's transaction this uses a SAVEPOINT, so the
+        # caller's pending writes are neither committed nor rolled back here
+        with self._batch_transaction():
+            self.cursor.executemany(
+                SQL_INSERT_BALANCE_CHECK,
+                self._pending_audit
+            )
+        self._pending_audit.clear()
+    
+    def close(self):
+        """
+        Finish using the account.
+        Writes any buffered balance check records so none are lost when the
+        session ends; call this before closing the database connection.
+        """
+        self.flush_audit()
+    
+    def export_history_csv(self, path: str):
+        """
+        Write this account's full transaction history to a CSV file, oldest first.
+        Rows are read in chunks and each chunk is formatted by a worker thread
+        while the next one is being fetched; the main thread writes the
+        finished chunks to the file in order.
+        
+        Args:
+            path (str): Path of the CSV file to create (overwritten if it exists)
+        
+        Returns:
+            int: Number of transactions exported
+        """
+        # Make sure buffered balance checks are included in the export
+        self.flush_audit()
+        
+        # A separate cursor so the export doesn't disturb self.cursor
+        rows = self.connection.execute(SQL_SELECT_FULL_HISTORY, (self.account_id,))
+        
+        count = 0
+        workers = os.cpu_count() or 1
+        with open(path, 'wb') as f, ThreadPoolExecutor(max_workers=workers) as pool:
+            f.write(b"Transaction ID,Action,Amount,Source/Reason,Balance After,Date\r\n")
+            
+            # Chunks waiting to be written, in file order
+            # Limiting how many are in flight keeps memory use bounded
+            pending = deque()
+            while True:
+                chunk = rows.fetchmany(EXPORT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                count += len(chunk)
+                pending.append(pool.submit(self._format_csv_chunk, chunk))
+                if len(pending) > workers * 2:
+                    f.write(pending.popleft().result())
+            
+            while pending:
+                f.write(pending.popleft().result())
+        
+        print(f"\n✓ Exported {count} transactions to {path}")
+        return count
+    
+    @staticmethod
+    def _format_csv_chunk(chunk):
+        """
+        Format a list of transaction rows as CSV (runs in a worker thread).
+        
+        Args:
+            chunk: List of rows from SQL_SELECT_FULL_HISTORY
+        
+        Returns:
+            bytes: The rows as UTF-8 encoded CSV text
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            (trans_id, action, amount, details, balance,
+             datetime.fromtimestamp(timestamp // 1000000).isoformat(sep=' '))
+            for trans_id, action, amount, details, balance, timestamp in chunk
         )
+        return buffer.getvalue().encode('utf-8')
+    
+    def get_transaction_history(self, limit: int = 200, before_id: int = None):
+        """
+        Retrieve and display transactions for this account from the database,
+        most recent first, one page at a time.
         
-        # fetchall() returns all matching rows as a list of tuples
-        transactions = self.cursor.fetchall()
+        Args:
+            limit (int): Maximum number of transactions to display
+            before_id (int): Only show transactions older than this transaction ID
+                (pass the value returned by the previous call to get the next page)
         
-        if not transactions:
-            print("\n✗ No transactions found!")
-            return
+        Returns:
+            int: ID of the last transaction displayed, to pass as before_id for the
+                next page, or None if there are no older transactions to show
+        """
+        # Make sure buffered balance checks show up in the history
+        self.flush_audit()
         
-        # Display transaction history in a formatted table
-        print(f"\n{'='*100}")
-        print(f"Transaction History for {self.account_holder}")
-        print(f"{'='*100}")
-        print(f"{'ID':<5} {'Action':<12} {'Amount':<12} {'Details':<20} {'Balance':<12} {'Date':<20}")
-        print(f"{'-'*100}")
+        # SELECT query to get this account's transactions
+        # ORDER BY transaction_id DESC sorts by most recent first
+        if before_id is None:
+            self.cursor.execute(
+                SQL_SELECT_HISTORY,
+                (self.account_id, limit)
+            )
+        else:
+            # Keyset pagination: seek straight to before_id in the index
+            # rather than skipping over rows with OFFSET
+            self.cursor.execute(
+                SQL_SELECT_HISTORY_BEFORE,
+                (self.account_id, before_id, limit)
+            )
         
-        # Loop through each transaction
-        for trans in transactions:
-            trans_id, action, amount, details, balance, date = trans
+        # Build the whole page as a list of lines and print it with a single write
+        # A page holds at most `limit` rows, so this stays small however long the history is
+        lines = [
+            f"\n{'='*100}",
+            f"Transaction History for {self.account_holder}",
+            f"{'='*100}",
+            f"{'ID':<5} {'Action':<12} {'Amount':<12} {'Details':<20} {'Balance':<12} {'Date':<20}",
+            f"{'-'*100}",
+        ]
+        last_id = None
+        count = 0
+        
+        # Loop through each transaction, reading rows straight from the cursor
+        for trans_id, action, amount, details, balance, timestamp in self.cursor:
             # Format amount: show "N/A" for Balance Check transactions
-            amount_str = f"${amount:.2f}" if amount else "N/A"
             # Truncate details if too long
-            details_str = (details[:19] if details else "")
-            
-            print(f"{trans_id:<5} {action:<12} {amount_str:<12} {details_str:<20} ${balance:<11.2f} {date:<20}")
+            # Convert the stored epoch microseconds to local date and time
+            lines.append(
+                f"{trans_id:<5} {action:<12} {f'${amount:.2f}' if amount else 'N/A':<12} "
+                f"{(details or '')[:19]:<20} ${balance:<11.2f} "
+                f"{datetime.fromtimestamp(timestamp // 1000000).isoformat(sep=' '):<20}"
+            )
+            last_id = trans_id
+            count += 1
         
-        print(f"{'='*100}\n")
+        if last_id is None:
+            if before_id is None:
+                print("\n✗ No transactions found!")
+            else:
+                print("\n✓ No older transactions.")
+            return None
+        
+        lines.append(f"{'='*100}\n")
+        sys.stdout.write("\n".join(lines) + "\n")
+        
+        # A page that isn't full means this was the oldest transaction
+        return last_id if count == limit else None
 
 
 # ============================================================================
 # MAIN PROGRAM
 # ============================================================================
 
+# Menu choices the user can type, mapped to the action they select
+MENU_ACTIONS = {
+    "1": "deposit", "deposit": "deposit",
+    "2": "withdraw", "withdraw": "withdraw",
+    "3": "balance", "balance": "balance",
+    "4": "history", "history": "history",
+    "5": "exit", "exit": "exit",
+}
+
+@lru_cache(maxsize=64)
+def _normalize_action(action: str):
+    """
+    Turn the user's menu input into an action name.
+    Results are cached, so repeated inputs skip the lowercasing and lookup.
+    
+    Args:
+        action (str): Text typed at the menu prompt
+    
+    Returns:
+        str: One of the MENU_ACTIONS values, or None if the input isn't recognised
+    """
+    return MENU_ACTIONS.get(action.strip().lower())
+
+
 def main():
     """Main program execution"""
     
     # Initialize the database
     db = BankDatabase('bank_system.db')
+    account = None
     
     try:
         # Get account information from user
@@ -373,9 +938,9 @@ def main():
             print("(4) View Transaction History")
             print("(5) Exit")
             
-            action = input("\nChoose an option (1-5): ").strip()
+            action = _normalize_action(input("\nChoose an option (1-5): "))
             
-            if action == "1" or action.lower() == "deposit":
+            if action == "deposit":
                 try:
                     amount = float(input("Enter deposit amount: $"))
                     source = input("Enter source (e.g., Salary, Transfer): ").strip()
@@ -383,7 +948,7 @@ def main():
                 except ValueError:
                     print("\n✗ Please enter a valid amount!")
             
-            elif action == "2" or action.lower() == "withdraw":
+            elif action == "withdraw":
                 try:
                     amount = float(input("Enter withdrawal amount: $"))
                     reason = input("Enter reason for withdrawal: ").strip()
@@ -391,13 +956,19 @@ def main():
                 except ValueError:
                     print("\n✗ Please enter a valid amount!")
             
-            elif action == "3" or action.lower() == "balance":
+            elif action == "balance":
                 account.check_balance()
             
-            elif action == "4" or action.lower() == "history":
-                account.get_transaction_history()
+            elif action == "history":
+                # Show the most recent page, then older pages for as long as the user asks
+                last_id = account.get_transaction_history()
+                while last_id is not None:
+                    more = input("Show older transactions? (y/n): ").strip().lower()
+                    if more not in ("y", "yes"):
+                        break
+                    last_id = account.get_transaction_history(before_id=last_id)
             
-            elif action == "5" or action.lower() == "exit":
+            elif action == "exit":
                 print("\n✓ Thank you for using Bank Management System!")
                 break
             
@@ -405,6 +976,10 @@ def main():
                 print("\n✗ Invalid option. Please choose 1-5.")
     
     finally:
+        # Write anything the account still has buffered before closing
+        if account is not None:
+            account.close()
+        
         # Always close the database connection when done
         # This ensures data is saved and resources are released
         db.close()